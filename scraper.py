@@ -4,68 +4,233 @@ Strava Club Events Calendar Scraper
 Scrapes upcoming events from Strava clubs and generates an ICS calendar file.
 """
 
-import time
+import argparse
 import configparser
-from datetime import datetime, timedelta
+import json
+import logging
+import operator
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urljoin
+from zoneinfo import ZoneInfo
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from selectolax.lexbor import LexborHTMLParser
 from selenium import webdriver
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-from icalendar import Calendar, Event
-import pytz
 import re
 import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Event title format: "Tue 6:30 AM / Event Title"
+_TITLE_RE = re.compile(r'(\w+)\s+(\d{1,2}:\d{2})\s+(AM|PM)\s*/\s*(.+)')
+
+# Month abbreviations as shown in the event date badge
+_MONTHS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+# Upper bound on concurrent club page requests sent to Strava
+MAX_CLUB_WORKERS = 8
+
+# Parsed events from earlier runs, keyed by event URL
+EVENT_CACHE_PATH = 'cache.json'
+
+# Chrome remote debugging address, so later runs can attach to an open browser
+CHROME_DEBUG_HOST = '127.0.0.1'
+CHROME_DEBUG_PORT = 9222
+
+# Calendar-level properties written at the top of calendar.ics
+_CALENDAR_HEADER = [
+    'BEGIN:VCALENDAR',
+    'VERSION:2.0',
+    'PRODID:-//Strava Club Events//mxm.dk//',
+    'CALSCALE:GREGORIAN',
+    'METHOD:PUBLISH',
+    'X-WR-CALNAME:Strava Club Events',
+    'X-WR-TIMEZONE:America/Los_Angeles',
+]
+
+def _node_text(node):
+    """Return a node's text with whitespace collapsed, like the rendered page"""
+    return ' '.join(node.text().split())
+
+def _event_uid(event_url):
+    """Build a stable calendar UID from the event ID at the end of its URL"""
+    return f"{event_url.rpartition('/')[2]}@strava-scraper"
+
+def _ics_text(value):
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (value.replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+def _ics_utc(dt):
+    """Format an aware datetime as an ICS UTC timestamp"""
+    return dt.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def _without_dtstamps(calendar_text):
+    """Drop DTSTAMP lines, which change on every run, so calendars can be compared by content"""
+    return [line for line in calendar_text.splitlines() if not line.startswith('DTSTAMP:')]
+
+def _ics_line(line):
+    """Fold a content line at 75 octets and terminate it with CRLF (RFC 5545 section 3.1)"""
+    chunks = []
+    chunk, size = '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > 75:
+            chunks.append(chunk)
+            # Continuation lines start with a space, which counts toward the limit
+            chunk, size = ' ', 1
+        chunk += char
+        size += char_size
+    chunks.append(chunk)
+    return '\r\n'.join(chunks) + '\r\n'
+
+@dataclass(slots=True)
+class ClubEvent:
+    """A scraped club event, timed for the calendar"""
+    name: str
+    datetime: datetime  # Calendar start, 30 minutes before the ride
+    url: str
+    original_time: datetime  # Ride start time
+    uid: str = field(init=False)
+    
+    def __post_init__(self):
+        self.uid = _event_uid(self.url)
 
 class StravaEventScraper:
     def __init__(self):
         self.driver = None
+        self.headless = False
+        self.session = None
         self.config = configparser.ConfigParser()
         self.events = []
-        self.pacific_tz = pytz.timezone('America/Los_Angeles')
+        self._event_cache = {}  # Event URL -> cached parsed event from earlier runs
+        self._fingerprints = {}  # Event URL -> scraped (title, date, month) text this run
+        self.pacific_tz = ZoneInfo('America/Los_Angeles')
+        self._now = None  # Reference time for the current run, set in run()
+        self._window_end = None  # Latest calendar time kept in the current run
+        self._login_expired = False  # Set when Strava redirects a club page to the login form
         
     def load_config(self):
         """Load configuration from config.ini"""
-        print("📄 Loading configuration...")
+        logger.info("📄 Loading configuration...")
         if not os.path.exists('config.ini'):
-            print("❌ config.ini not found. Please create it with your Strava credentials.")
+            logger.error("❌ config.ini not found. Please create it with your Strava credentials.")
             return False
             
         self.config.read('config.ini')
         
         if 'strava' not in self.config or not self.config['strava'].get('email'):
-            print("❌ Missing Strava credentials in config.ini")
+            logger.error("❌ Missing Strava credentials in config.ini")
             return False
             
-        print(f"✅ Config loaded for email: {self.config['strava']['email']}")
+        logger.info(f"✅ Config loaded for email: {self.config['strava']['email']}")
         return True
     
-    def setup_driver(self):
-        """Initialize Chrome WebDriver with session persistence"""
-        print("🌐 Setting up Chrome browser...")
+    def chrome_is_running(self):
+        """Check whether a Chrome instance is listening on the remote debugging port"""
+        try:
+            with socket.create_connection((CHROME_DEBUG_HOST, CHROME_DEBUG_PORT), timeout=0.5):
+                return True
+        except OSError:
+            return False
+    
+    def setup_driver(self, headless=True):
+        """Initialize Chrome WebDriver with session persistence, reusing an open browser if possible"""
+        if self.driver:
+            return
         
         chrome_options = Options()
-        # Use persistent profile to save cookies
-        chrome_options.add_argument("--user-data-dir=./chrome_profile")
-        chrome_options.add_argument("--profile-directory=Default")
-        # Not headless for better detection avoidance
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
+        # Return from driver.get() once the DOM is ready instead of waiting for every subresource
+        chrome_options.page_load_strategy = 'eager'
+        debug_address = f"{CHROME_DEBUG_HOST}:{CHROME_DEBUG_PORT}"
+        
+        if self.chrome_is_running():
+            logger.info(f"🌐 Attaching to running Chrome browser at {debug_address}...")
+            chrome_options.debugger_address = debug_address
+            self.driver = webdriver.Chrome(options=chrome_options)
+            self.headless = "HeadlessChrome" in self.driver.execute_script("return navigator.userAgent")
+        else:
+            logger.info(f"🌐 Setting up {'headless ' if headless else ''}Chrome browser...")
+            # Use persistent profile to save cookies
+            chrome_options.add_argument("--user-data-dir=./chrome_profile")
+            chrome_options.add_argument("--profile-directory=Default")
+            if headless:
+                # Only used to check the saved login, so skip rendering and images
+                chrome_options.add_argument("--headless=new")
+                chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            # Expose the browser and keep it open after exit so the next run can attach
+            chrome_options.add_argument(f"--remote-debugging-port={CHROME_DEBUG_PORT}")
+            chrome_options.add_experimental_option("detach", True)
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+            
+            self.driver = webdriver.Chrome(options=chrome_options)
+            self.headless = headless
         
-        self.driver = webdriver.Chrome(options=chrome_options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
         
-        print("✅ Chrome browser ready")
+        logger.info("✅ Chrome browser ready")
+    
+    def close_browser(self):
+        """Close Chrome itself, including a browser this run only attached to"""
+        try:
+            # quit() leaves attached and detached browsers running, so ask Chrome to exit
+            self.driver.execute_cdp_cmd('Browser.close', {})
+        except Exception:
+            pass
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
+        
+        # Wait for the debugging port to be released before another browser starts
+        for _ in range(50):
+            if not self.chrome_is_running():
+                break
+            time.sleep(0.1)
+    
+    def shutdown(self):
+        """Close the browser and HTTP session"""
+        if self.session:
+            self.session.close()
+            self.session = None
+        if self.driver:
+            logger.info("\n🔒 Closing browser...")
+            self.close_browser()
         
     def login_to_strava(self):
         """Open login page and wait for manual login"""
-        print("🔐 Opening Strava login page...")
-        print("Please log in manually in the browser window.")
-        print("After logging in successfully, press Enter in this terminal to continue...")
-        
+        logger.info("🔐 Opening Strava login page...")
         self.driver.get("https://www.strava.com/login")
         
+        # A browser that is still logged in gets redirected straight to the dashboard or feed
+        if "dashboard" in self.driver.current_url or "feed" in self.driver.current_url:
+            logger.info("✅ Already logged in")
+            return True
+        
+        # Manual login needs a visible window
+        if self.headless:
+            logger.info("ℹ️  No saved Strava login found, opening a browser window...")
+            self.close_browser()
+            self.setup_driver(headless=False)
+            self.driver.get("https://www.strava.com/login")
+        
+        logger.info("Please log in manually in the browser window.")
+        logger.info("After logging in successfully, press Enter in this terminal to continue...")
+        
         # Wait for user to press Enter
         input()
         
@@ -74,276 +239,433 @@ class StravaEventScraper:
             WebDriverWait(self.driver, 10).until(
                 lambda driver: "dashboard" in driver.current_url or "feed" in driver.current_url
             )
-            print("✅ Login verified successfully")
+            logger.info("✅ Login verified successfully")
             return True
         except Exception as e:
-            print("❌ Login verification failed. Please ensure you're logged in to Strava.")
-            print("Press Enter to try again, or Ctrl+C to exit...")
+            logger.error("❌ Login verification failed. Please ensure you're logged in to Strava.")
+            logger.info("Press Enter to try again, or Ctrl+C to exit...")
             input()
             return self.login_to_strava()  # Retry login
     
+    def create_session(self):
+        """Copy the logged-in browser cookies into a requests session"""
+        logger.info("🍪 Exporting Strava session cookies...")
+        
+        self.session = requests.Session()
+        # Keep one warm connection per scraping thread and retry transient Strava errors
+        adapter = HTTPAdapter(
+            pool_connections=MAX_CLUB_WORKERS,
+            pool_maxsize=MAX_CLUB_WORKERS,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount('https://', adapter)
+        for cookie in self.driver.get_cookies():
+            self.session.cookies.set(
+                cookie['name'], cookie['value'],
+                domain=cookie.get('domain'), path=cookie.get('path', '/')
+            )
+        # Present the same browser identity Strava saw at login, minus the headless marker
+        user_agent = self.driver.execute_script("return navigator.userAgent")
+        self.session.headers['User-Agent'] = user_agent.replace("HeadlessChrome", "Chrome")
+        
+        logger.info(f"✅ HTTP session ready with {len(self.session.cookies)} cookies")
+    
+    def load_event_cache(self):
+        """Load parsed events from earlier runs, dropping ones that have already passed"""
+        self._event_cache = {}
+        if not os.path.exists(EVENT_CACHE_PATH):
+            return
+        
+        try:
+            with open(EVENT_CACHE_PATH, 'r') as f:
+                entries = json.load(f)
+            
+            for url, entry in entries.items():
+                event = ClubEvent(
+                    name=entry['name'],
+                    datetime=datetime.fromisoformat(entry['datetime']).astimezone(self.pacific_tz),
+                    url=url,
+                    original_time=datetime.fromisoformat(entry['original_time']).astimezone(self.pacific_tz),
+                )
+                if event.datetime >= self._now:
+                    self._event_cache[url] = {'fingerprint': tuple(entry['fingerprint']), 'event': event}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable {EVENT_CACHE_PATH}: {str(e)}")
+            self._event_cache = {}
+            return
+        
+        logger.info(f"♻️  Loaded {len(self._event_cache)} cached events")
+    
+    def save_event_cache(self):
+        """Save the current events so the next run can skip re-parsing them"""
+        entries = {
+            event.url: {
+                'fingerprint': self._fingerprints[event.url],
+                'name': event.name,
+                'datetime': event.datetime.isoformat(),
+                'original_time': event.original_time.isoformat(),
+            }
+            for event in self.events
+            if event.url in self._fingerprints
+        }
+        
+        try:
+            with open(EVENT_CACHE_PATH, 'w') as f:
+                json.dump(entries, f, indent=2)
+        except OSError as e:
+            logger.warning(f"⚠️  Failed to save {EVENT_CACHE_PATH}: {str(e)}")
+    
     def load_club_urls(self):
         """Load club URLs from clubs.txt"""
-        print("📋 Loading club URLs...")
+        logger.info("📋 Loading club URLs...")
         
         if not os.path.exists('clubs.txt'):
-            print("❌ clubs.txt not found")
+            logger.error("❌ clubs.txt not found")
             return []
             
         with open('clubs.txt', 'r') as f:
             urls = [line.strip() for line in f if line.strip() and not line.startswith('#')]
             
-        print(f"✅ Found {len(urls)} club URLs to scrape")
+        logger.info(f"✅ Found {len(urls)} club URLs to scrape")
         for i, url in enumerate(urls, 1):
-            print(f"   {i}. {url}")
+            logger.info(f"   {i}. {url}")
             
         return urls
     
     def scrape_club_events(self, club_url):
-        """Scrape events from a single club"""
-        print(f"\n🏃 Scraping club: {club_url}")
+        """Scrape events from a single club, or return None if its page couldn't be scraped"""
+        logger.info(f"\n🏃 Scraping club: {club_url}")
         
         try:
-            self.driver.get(club_url)
-            time.sleep(3)
+            response = self.session.get(club_url, timeout=30)
+            response.raise_for_status()
+            if '/login' in response.url:
+                logger.error("❌ Redirected to login page - Strava session is not authenticated")
+                self._login_expired = True
+                return None
             
-            # Look for "View All" button and click if present
-            try:
-                view_all_btn = self.driver.find_element(By.CSS_SELECTOR, "button[data-show-all^='View All']")
-                view_all_btn.click()
-                print("👁️  Clicked 'View All' button")
-                time.sleep(2)  # Give time for events to load
-            except Exception as e:
-                print(f"ℹ️  No 'View All' button found or error clicking it: {str(e)}")
+            # The "View All" button only unhides rows that are already in the page markup,
+            # so every upcoming event is available from the initial HTML
+            tree = LexborHTMLParser(response.text)
             
             # Find all event rows
-            event_rows = self.driver.find_elements(By.CSS_SELECTOR, "li.row")
-            print(f"🔍 Found {len(event_rows)} potential event rows")
+            event_rows = tree.css("li.row")
+            logger.info(f"🔍 Found {len(event_rows)} potential event rows")
             
             club_events = []
             for i, row in enumerate(event_rows):
                 try:
                     # Look for event title link
-                    title_link = row.find_element(By.CSS_SELECTOR, "a.group-event-title")
-                    title_text = title_link.text.strip()
-                    event_url = title_link.get_attribute('href')
+                    title_link = row.css_first("a.group-event-title")
+                    if title_link is None:
+                        raise ValueError("no event title link")
+                    title_text = _node_text(title_link)
+                    href = title_link.attrs.get('href')
+                    if not href:
+                        raise ValueError("no event link")
+                    event_url = urljoin(response.url, href)
                     
                     # Look for date elements
-                    date_elem = row.find_element(By.CSS_SELECTOR, ".date")
-                    month_elem = row.find_element(By.CSS_SELECTOR, ".month")
-                    
-                    date_text = date_elem.text.strip()
-                    month_text = month_elem.text.strip()
+                    date_elem = row.css_first(".date")
+                    month_elem = row.css_first(".month")
+                    if date_elem is None or month_elem is None:
+                        raise ValueError("no event date")
+                    date_text = _node_text(date_elem)
+                    month_text = _node_text(month_elem)
                     
-                    print(f"   📅 Event {i+1}: {title_text}")
-                    print(f"      Date: {month_text} {date_text}")
-                    print(f"      URL: {event_url}")
+                    logger.debug("   📅 Event %d: %s", i + 1, title_text)
+                    logger.debug("      Date: %s %s", month_text, date_text)
+                    logger.debug("      URL: %s", event_url)
                     
-                    # Parse the event
-                    parsed_event = self.parse_event_details(title_text, date_text, month_text, event_url)
-                    if parsed_event:
-                        club_events.append(parsed_event)
-                        print(f"      ✅ Parsed successfully")
+                    # Reuse the parsed event from an earlier run if its listing hasn't changed
+                    fingerprint = (title_text, date_text, month_text)
+                    self._fingerprints[event_url] = fingerprint
+                    cached = self._event_cache.get(event_url)
+                    if cached and cached['fingerprint'] == fingerprint:
+                        parsed_event = cached['event']
+                        logger.debug("      ♻️  Unchanged since last run, using cached event")
                     else:
-                        print(f"      ⚠️  Failed to parse event details")
+                        # Parse the event
+                        parsed_event = self.parse_event_details(title_text, date_text, month_text, event_url)
+                        if not parsed_event:
+                            logger.debug("      ⚠️  Failed to parse event details")
+                            continue
+                        logger.debug("      ✅ Parsed successfully")
+                    
+                    # Only keep events in the next 4 weeks
+                    if not self._now <= parsed_event.datetime <= self._window_end:
+                        logger.debug("      ⏭️  Outside the next 4 weeks, skipping")
+                        continue
+                    club_events.append(parsed_event)
                         
                 except Exception as e:
-                    print(f"      ❌ Error parsing event row {i+1}: {str(e)}")
+                    logger.error(f"      ❌ Error parsing event row {i+1}: {str(e)}")
                     continue
             
-            print(f"✅ Successfully scraped {len(club_events)} events from club")
+            logger.info(f"✅ Successfully scraped {len(club_events)} events from {club_url}")
             return club_events
             
         except Exception as e:
-            print(f"❌ Error scraping club {club_url}: {str(e)}")
-            return []
+            logger.error(f"❌ Error scraping club {club_url}: {str(e)}")
+            return None
     
     def parse_event_details(self, title_text, date_text, month_text, event_url):
         """Parse event details from scraped text"""
         try:
             # Parse title format: "Tue 6:30 AM / Event Title"
-            title_match = re.match(r'(\w+)\s+(\d{1,2}:\d{2})\s+(AM|PM)\s*/\s*(.+)', title_text)
+            title_match = _TITLE_RE.match(title_text)
             if not title_match:
-                print(f"      ⚠️  Could not parse title format: {title_text}")
+                logger.warning(f"      ⚠️  Could not parse title format: {title_text}")
                 return None
                 
             day_name, time_str, am_pm, event_name = title_match.groups()
             
             # Parse date (assume current year, handle year rollover)
-            current_year = datetime.now().year
+            current_year = self._now.year
             try:
                 # Try current year first
-                event_date = datetime.strptime(f"{date_text} {month_text} {current_year}", "%d %b %Y")
+                event_date = datetime(current_year, _MONTHS[month_text.title()], int(date_text))
                 # If date is more than 2 months in the past, assume next year
-                if event_date < datetime.now() - timedelta(days=60):
-                    event_date = datetime.strptime(f"{date_text} {month_text} {current_year + 1}", "%d %b %Y")
-            except ValueError:
-                print(f"      ⚠️  Could not parse date: {date_text} {month_text}")
+                if event_date.date() < (self._now - timedelta(days=60)).date():
+                    event_date = event_date.replace(year=current_year + 1)
+            except (KeyError, ValueError):
+                logger.warning(f"      ⚠️  Could not parse date: {date_text} {month_text}")
                 return None
             
             # Parse time
             try:
-                time_obj = datetime.strptime(f"{time_str} {am_pm}", "%I:%M %p").time()
+                hours, minutes = map(int, time_str.split(':'))
+                if not 1 <= hours <= 12:
+                    raise ValueError(time_str)
+                naive_datetime = event_date.replace(hour=hours % 12 + (12 if am_pm == 'PM' else 0), minute=minutes)
             except ValueError:
-                print(f"      ⚠️  Could not parse time: {time_str} {am_pm}")
+                logger.warning(f"      ⚠️  Could not parse time: {time_str} {am_pm}")
                 return None
             
-            # Combine date and time in Pacific timezone
-            naive_datetime = datetime.combine(event_date.date(), time_obj)
-            event_datetime = self.pacific_tz.localize(naive_datetime)
+            # Attach the Pacific timezone
+            event_datetime = naive_datetime.replace(tzinfo=self.pacific_tz)
             
             # Calendar event should be 30 minutes BEFORE ride time
             calendar_datetime = event_datetime - timedelta(minutes=30)
             
-            return {
-                'name': event_name.strip(),
-                'datetime': calendar_datetime,
-                'url': event_url,
-                'original_time': event_datetime
-            }
+            return ClubEvent(
+                name=event_name.strip(),
+                datetime=calendar_datetime,
+                url=event_url,
+                original_time=event_datetime
+            )
             
         except Exception as e:
-            print(f"      ❌ Error parsing event: {str(e)}")
+            logger.error(f"      ❌ Error parsing event: {str(e)}")
             return None
     
-    def filter_events_by_date_range(self):
-        """Filter events to next 4 weeks only"""
-        print(f"\n📅 Filtering events to next 4 weeks...")
+    def sort_events_by_date(self):
+        """Sort events by calendar time and list them"""
+        logger.info(f"\n📅 Events in the next 4 weeks:")
         
-        now = datetime.now(self.pacific_tz)
-        four_weeks_later = now + timedelta(weeks=4)
-        
-        original_count = len(self.events)
-        self.events = [event for event in self.events if now <= event['datetime'] <= four_weeks_later]
-        
-        print(f"✅ Kept {len(self.events)} events (filtered out {original_count - len(self.events)})")
-        
-        # Show filtered events
-        for event in sorted(self.events, key=lambda x: x['datetime']):
-            print(f"   📅 {event['datetime'].strftime('%a %m/%d %I:%M %p')} - {event['name']}")
+        self.events.sort(key=operator.attrgetter('datetime'))
+        for event in self.events:
+            logger.info(f"   📅 {event.datetime.strftime('%a %m/%d %I:%M %p')} - {event.name}")
     
     def generate_ics_calendar(self):
         """Generate ICS calendar file and commit to GitHub"""
-        print(f"\n📄 Generating calendar.ics...")
-        
-        cal = Calendar()
-        cal.add('prodid', '-//Strava Club Events//mxm.dk//')
-        cal.add('version', '2.0')
-        cal.add('calscale', 'GREGORIAN')
-        cal.add('method', 'PUBLISH')
-        cal.add('X-WR-CALNAME', 'Strava Club Events')
-        cal.add('X-WR-TIMEZONE', 'America/Los_Angeles')
-        
-        for event_data in self.events:
-            event = Event()
-            event.add('summary', event_data['name'])
-            event.add('dtstart', event_data['datetime'])
-            event.add('dtend', event_data['datetime'] + timedelta(minutes=30))
-            event.add('description', f"Strava Event: {event_data['url']}\nRide starts at: {event_data['original_time'].strftime('%I:%M %p')}")
-            event.add('url', event_data['url'])
-            event.add('uid', f"{event_data['url'].split('/')[-1]}@strava-scraper")
-            event.add('dtstamp', datetime.now(pytz.UTC))
-            
-            cal.add_component(event)
+        logger.info(f"\n📄 Generating calendar.ics...")
         
         # Ensure docs directory exists
         os.makedirs('docs', exist_ok=True)
         
-        # Write to file in docs directory
         calendar_path = os.path.join('docs', 'calendar.ics')
-        with open(calendar_path, 'wb') as f:
-            f.write(cal.to_ical())
-            
-        print(f"✅ Generated calendar.ics with {len(self.events)} events")
-        print(f"📍 File location: {os.path.abspath(calendar_path)}")
-        print(f"🌐 Will be available at: https://defeomike.github.io/strava-club-ride-calendar/calendar.ics")
+        # All events from one run share a DTSTAMP
+        dtstamp = _ics_utc(datetime.now(timezone.utc))
+        
+        lines = list(_CALENDAR_HEADER)
+        for event_data in self.events:
+            description = f"Strava Event: {event_data.url}\nRide starts at: {event_data.original_time.strftime('%I:%M %p')}"
+            lines.extend((
+                'BEGIN:VEVENT',
+                f"SUMMARY:{_ics_text(event_data.name)}",
+                f"DTSTART:{_ics_utc(event_data.datetime)}",
+                f"DTEND:{_ics_utc(event_data.datetime + timedelta(minutes=30))}",
+                f"DTSTAMP:{dtstamp}",
+                f"UID:{_ics_text(event_data.uid)}",
+                f"DESCRIPTION:{_ics_text(description)}",
+                f"URL:{event_data.url}",
+                'END:VEVENT',
+            ))
+        lines.append('END:VCALENDAR')
+        calendar_text = ''.join(_ics_line(line) for line in lines)
+        
+        # Leave the file alone if only the DTSTAMPs would change
+        try:
+            with open(calendar_path, 'r', encoding='utf-8', newline='') as f:
+                old_calendar_text = f.read()
+        except FileNotFoundError:
+            old_calendar_text = ''
+        if _without_dtstamps(calendar_text) == _without_dtstamps(old_calendar_text):
+            logger.info(f"ℹ️  No changes to calendar.ics ({len(self.events)} events), keeping existing file")
+        else:
+            with open(calendar_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(calendar_text)
+                
+            logger.info(f"✅ Generated calendar.ics with {len(self.events)} events")
+            logger.info(f"📍 File location: {os.path.abspath(calendar_path)}")
+            logger.info(f"🌐 Will be available at: https://defeomike.github.io/strava-club-ride-calendar/calendar.ics")
         
         # Commit and push changes
         try:
             import subprocess
-            print("\n📤 Committing and pushing changes to GitHub...")
-            
-            # Add the calendar file
-            subprocess.run(['git', 'add', calendar_path], check=True)
-            
-            # Get current date for commit message
-            date_str = datetime.now().strftime('%Y-%m-%d %H:%M')
             
-            # Commit with timestamp
-            subprocess.run(['git', 'commit', '-m', f'Update calendar with latest events ({date_str})'], check=True)
+            status = subprocess.run(
+                ['git', 'status', '--porcelain', '--', calendar_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            if status.strip():
+                logger.info("\n📤 Committing and pushing changes to GitHub...")
+                
+                # A tracked file is committed straight from the working tree; a new one needs adding first
+                if status.startswith('??'):
+                    subprocess.run(['git', 'add', calendar_path], check=True)
+                
+                # Get current date for commit message
+                date_str = datetime.now().strftime('%Y-%m-%d %H:%M')
+                
+                # Commit with timestamp, limited to the calendar file
+                subprocess.run(['git', 'commit', '-m', f'Update calendar with latest events ({date_str})', '--', calendar_path], check=True)
+            else:
+                # The file matches HEAD; only push if an earlier run committed but failed to push
+                ahead = subprocess.run(
+                    ['git', 'rev-list', '--count', '@{u}..HEAD'],
+                    capture_output=True, text=True
+                )
+                if ahead.returncode != 0 or int(ahead.stdout) == 0:
+                    logger.info("\nℹ️  calendar.ics is unchanged, nothing to push")
+                    return
+                
+                logger.info("\n📤 Pushing earlier calendar commits to GitHub...")
             
             # Push to GitHub
             subprocess.run(['git', 'push'], check=True)
             
-            print("✅ Successfully updated calendar on GitHub")
+            logger.info("✅ Successfully updated calendar on GitHub")
             
         except subprocess.CalledProcessError as e:
-            print(f"⚠️  Failed to update GitHub: {str(e)}")
-            print("💡 You can manually commit and push the changes later")
+            logger.warning(f"⚠️  Failed to update GitHub: {str(e)}")
+            logger.info("💡 You can manually commit and push the changes later")
         except Exception as e:
-            print(f"⚠️  Unexpected error updating GitHub: {str(e)}")
-            print("💡 You can manually commit and push the changes later")
+            logger.warning(f"⚠️  Unexpected error updating GitHub: {str(e)}")
+            logger.info("💡 You can manually commit and push the changes later")
     
     def run(self):
         """Main execution flow"""
-        print("🚀 Starting Strava Club Events Scraper")
-        print("=" * 50)
+        logger.info("🚀 Starting Strava Club Events Scraper")
+        logger.info("=" * 50)
+        
+        # Use one reference time for parsing and filtering the whole run
+        self._now = datetime.now(self.pacific_tz)
+        self._window_end = self._now + timedelta(weeks=4)
+        self.events = []
+        self._fingerprints = {}
         
         try:
             # Load configuration
             if not self.load_config():
                 return False
             
-            # Setup browser
-            self.setup_driver()
+            # Load events parsed by earlier runs
+            self.load_event_cache()
             
-            # Login to Strava
-            if not self.login_to_strava():
-                return False
+            # Setup browser and log in, unless an earlier run in this process already did
+            if self.session is None:
+                self.setup_driver()
+                
+                # Login to Strava
+                if not self.login_to_strava():
+                    return False
+                
+                # Reuse the browser login for plain HTTP requests
+                self.create_session()
             
             # Load club URLs
             club_urls = self.load_club_urls()
             if not club_urls:
                 return False
             
-            # Scrape each club
-            for club_url in club_urls:
-                club_events = self.scrape_club_events(club_url)
-                self.events.extend(club_events)
-                time.sleep(2)  # Brief pause between clubs
-            
-            # Filter events by date range
-            self.filter_events_by_date_range()
+            # Scrape clubs concurrently; map() keeps results in clubs.txt order
+            self._login_expired = False
+            scraped_clubs = 0
+            with ThreadPoolExecutor(max_workers=min(MAX_CLUB_WORKERS, len(club_urls))) as executor:
+                for club_events in executor.map(self.scrape_club_events, club_urls):
+                    if club_events is not None:
+                        scraped_clubs += 1
+                        self.events.extend(club_events)
+            
+            # Log in again on the next run if Strava stopped accepting the session cookies
+            if self._login_expired:
+                logger.warning("⚠️  Strava session expired, will log in again on the next run")
+                self.session.close()
+                self.session = None
+            
+            # Sort events by date
+            self.sort_events_by_date()
+            # Keep the previous cache if no club page could be scraped
+            if scraped_clubs:
+                self.save_event_cache()
             
             # Generate calendar
             if self.events:
                 self.generate_ics_calendar()
-                print("\n🎉 Scraping completed successfully!")
-                print(f"📊 Total events: {len(self.events)}")
-                print("💡 You can now commit calendar.ics to GitHub")
+                logger.info("\n🎉 Scraping completed successfully!")
+                logger.info(f"📊 Total events: {len(self.events)}")
+                logger.info("💡 You can now commit calendar.ics to GitHub")
             else:
-                print("\n⚠️  No events found to add to calendar")
+                logger.warning("\n⚠️  No events found to add to calendar")
             
             return True
             
         except Exception as e:
-            print(f"\n❌ Unexpected error: {str(e)}")
+            logger.error(f"\n❌ Unexpected error: {str(e)}")
             return False
-            
-        finally:
-            if self.driver:
-                print("\n🔒 Closing browser...")
-                self.driver.quit()
+
+def positive_int(value):
+    """argparse type for a strictly positive integer"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number of minutes, got {value}")
+    return number
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape Strava club events into an ICS calendar")
+    parser.add_argument('--interval', type=positive_int, metavar='MINUTES',
+                        help="keep running and re-scrape every MINUTES, reusing the browser login")
+    parser.add_argument('--keep-browser', action='store_true',
+                        help="leave Chrome open on exit so the next run can attach to it")
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="show details for every scraped event")
+    args = parser.parse_args()
+    
+    # Per-event details only with --verbose; keep library loggers at INFO either way
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    logger.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+    
     scraper = StravaEventScraper()
-    success = scraper.run()
+    try:
+        success = scraper.run()
+        while success and args.interval:
+            logger.info(f"\n⏰ Next run in {args.interval} minutes (Ctrl+C to stop)")
+            time.sleep(args.interval * 60)
+            success = scraper.run()
+    except KeyboardInterrupt:
+        logger.info("\n👋 Stopping scraper")
+        success = True
+    finally:
+        if not args.keep_browser:
+            scraper.shutdown()
     
     if not success:
-        print("\n💡 Common issues:")
-        print("   - Check config.ini has correct Strava credentials")
-        print("   - Ensure clubs.txt exists with valid club URLs")
-        print("   - Try running again if login failed")
+        logger.info("\n💡 Common issues:")
+        logger.info("   - Check config.ini has correct Strava credentials")
+        logger.info("   - Ensure clubs.txt exists with valid club URLs")
+        logger.info("   - Try running again if login failed")
         exit(1)
 
 if __name__ == "__main__":